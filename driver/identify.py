@@ -7,24 +7,41 @@ This simple script issues the *IDN? SCPI command to the serial device and
 reads the response. It uses the python serial library.
 """
 
+import atexit
+import functools
 import sys
 import serial
 
+@functools.lru_cache(maxsize=8)
+def get_serial(device: str) -> serial.Serial:
+    """Open the serial device once per process and reuse the handle.
+
+    Opening the port (termios setup, buffer flushes) is the slowest part of
+    an identify, so scripts that identify repeatedly should share a handle.
+    """
+    # You should use a serial library, since it will automatically do the
+    # termios configuration, including disabling echo and line ending
+    # modification.
+    ser = serial.Serial(device, timeout=0.2)
+    atexit.register(ser.close)
+    return ser
+
+def identify(device: str) -> str:
+    """Return the *IDN? response of the device."""
+    ser = get_serial(device)
+    ser.write(b"*IDN?\n")
+    ser.flush()
+    # Return as soon as the response terminator arrives, instead of
+    # waiting out the full timeout for 1024 bytes that never come.
+    return ser.read_until(b"\n", size=1024).decode()
+
 def main(argv: list[str]):
     if len(argv) != 2:
         print("Usage: identify.py <device>")
         sys.exit(1)
 
     device = sys.argv[1]
-
-    # You should use a serial library, since it will automatically do the
-    # termios configuration, including disabling echo and line ending
-    # modification.
-    with serial.Serial(device, timeout=1) as ser:
-        ser.write(b"*IDN?\n")
-        ser.flush()
-        response = ser.read(1024)
-        print(f"Identity: {response.decode()}")
+    print(f"Identity: {identify(device)}")
 
 if __name__ == "__main__":
     main(sys.argv)
@@ -9,21 +9,43 @@ https://files.owon.com.cn/software/Application/HDS200_Series_SCPI_Protocol.pdf
 """
 # %% Imports and Definitions
 
-import time
+import functools
+import re
+from collections import deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Literal, Self
+from types import MappingProxyType
+from typing import Any, ClassVar, Literal, Self
 
 import numpy as np
 import pint
 import plotly.graph_objects as go
 
-from owon_scpi_base import OwonSCPIBase
+import utils
+from owon_scpi_base import OwonSCPIBase, voltage_lut
 from owon_serial_scpi import OwonSerialSCPI
 from owon_usb_scpi import OwonUSBSCPI
 
 
-@dataclass
+@functools.cache
+def _parse_quantity(value: str) -> tuple[float, pint.Unit]:
+    """Parse a unit string into its magnitude and units, caching the slow parse."""
+    quantity = pint.Quantity(value)
+    return quantity.magnitude, quantity.units
+
+
+def _quantity(value: str) -> pint.Quantity:
+    """Return a new quantity for a unit string, so callers may mutate it."""
+    return pint.Quantity(*_parse_quantity(value))
+
+
+# Manufacturer, model, serial number, and firmware version.
+_IDN_RE = re.compile(r"([^,]*),([^,]*),([^,]*),([^,]*)")
+
+
+@dataclass(frozen=True, slots=True)
 class DeviceIdentification:
     manufacturer: str
     model: str
@@ -73,6 +95,11 @@ class DeviceIdentification:
         }
     )
 
+    # Series keyed by the model prefix, e.g. "HDS272S" -> "HDS2".
+    _SERIES_BY_PREFIX: ClassVar[Mapping[str, str]] = MappingProxyType(
+        {"HDS2": "HDS200", "HDS3": "HDS300"}
+    )
+
     def __str__(self) -> str:
         return (
             f"Make/Model: {self.manufacturer} {self.model}\n"
@@ -80,6 +107,12 @@ class DeviceIdentification:
             f"Firmware:   {self.firmware_version}"
         )
 
+    def _series(self) -> str | None:
+        """Return the OWON handheld series of the model, if known."""
+        if self.manufacturer != "OWON":
+            return None
+        return self._SERIES_BY_PREFIX.get(self.model[:4])
+
     def is_hds200(self) -> bool:
         """Checks if the model indicates that it is an HDS200 series oscilloscope.
 
@@ -94,7 +127,7 @@ class DeviceIdentification:
 
         This was only tested with an OWON HDS272S.
         """
-        return self.manufacturer == "OWON" and self.model.startswith("HDS2")
+        return self._series() == "HDS200"
 
     def is_hds300(self) -> bool:
         """Checks if the model indicates that it is an HDS300 series oscilloscope.
@@ -106,7 +139,7 @@ class DeviceIdentification:
 
         This is untested.
         """
-        return self.manufacturer == "OWON" and self.model.startswith("HDS3")
+        return self._series() == "HDS300"
 
     def wavegen_supported(self) -> bool:
         """Checks if the model supports waveform generation.
@@ -124,6 +157,22 @@ class Channel(Enum):
     CH2 = 2
 
 
+# Channel number strings for SCPI commands, avoiding Enum value lookups.
+_CHANNEL_NUMBER: Mapping[Channel, str] = MappingProxyType(
+    {channel: str(channel.value) for channel in Channel}
+)
+
+
+def _channel_queries(template: str) -> Mapping[Channel, bytes]:
+    """Pre-encode a query template, like ":CH{}:DISPlay?", for every channel."""
+    return MappingProxyType(
+        {
+            channel: f"{template.format(_CHANNEL_NUMBER[channel])}\n".encode("ascii")
+            for channel in Channel
+        }
+    )
+
+
 class OwonDevice:
     """
     Interface for communicating with OWON oscilloscopes.
@@ -170,21 +219,19 @@ class OwonDevice:
         self.oscope = OwonOscilloscope(self)
 
     def identify(self) -> DeviceIdentification | None:
-        """Get the device identification."""
+        """Get the device identification.
+
+        The identification is fetched once and cached in `self.id`.
+        """
+        if getattr(self, "id", None):
+            return self.id
         idn = self.scpi.query("*IDN?")
-        if idn:
-            parts = idn.split(",")
-            if len(parts) == 4:
-                return DeviceIdentification(
-                    manufacturer=parts[0],
-                    model=parts[1],
-                    serial_number=parts[2],
-                    firmware_version=parts[3],
-                )
-            else:
-                raise ValueError(f"Invalid identification string '{idn}'")
-        else:
+        if not idn:
             raise ValueError(f"No identification string received")
+        match = _IDN_RE.fullmatch(idn)
+        if not match:
+            raise ValueError(f"Invalid identification string '{idn}'")
+        return DeviceIdentification(*match.groups())
 
     def close(self) -> None:
         """Close the connection to the oscilloscope."""
@@ -198,12 +245,22 @@ class OwonOscilloscope:
     multifunctional oscilloscope.
     """
 
+    # Pre-encoded per channel queries for the hot getters.
+    _QUERY_SCREEN_VALUES = _channel_queries(":DATa:WAVe:SCReen:ch{}?")
+    _QUERY_COUPLING = _channel_queries(":CH{}:COUPling?")
+    _QUERY_VERTICAL_SCALE = _channel_queries(":CH{}:SCALe?")
+    _QUERY_PROBE = _channel_queries(":CH{}:PROB?")
+    _QUERY_DISPLAY = _channel_queries(":CH{}:DISPlay?")
+
     _device: OwonDevice
+    # Lookup table from raw screen data byte to volts, per channel.
+    _volts_conversion: dict[Channel, np.ndarray]
 
     def __init__(self, device: OwonDevice):
         self._device = device
+        self._volts_conversion = {}
 
-    def screen_values(self, channel: Channel) -> list[int]:
+    def screen_values(self, channel: Channel) -> np.ndarray:
         """Fetch all the raw data points for a given channel.
 
         Note that these values are in some unknown screen related units.
@@ -211,14 +268,17 @@ class OwonOscilloscope:
         channel. This differs from the 4K or 8K (depending on mem depth mode)
         values that are produced when saving the waveform on the actual device
         and retrieving via Mass Storage Mode.
+
+        Returns:
+            A read-only `np.int8` array viewing the received packet bytes.
         """
 
         data = self._device.scpi.query(
-            f":DATa:WAVe:SCReen:ch{channel.value}?",
+            self._QUERY_SCREEN_VALUES[channel],
             data_type="int8",
             length_header=True,
         )
-        if not data:
+        if data is None:
             raise ValueError(f"No data received for channel {channel.value}")
         return data
 
@@ -237,6 +297,77 @@ class OwonOscilloscope:
             raise ValueError(f"No data received for screen header")
         return data
 
+    def screen_values_volts(
+        self, channel: Channel, refresh_header: bool = False
+    ) -> np.ndarray:
+        """Fetch the screen data points for a given channel in volts.
+
+        The probe, scale, and offset from the screen header are cached per
+        channel and dropped by the channel setters of this class. Pass
+        `refresh_header=True` if the settings were changed on the device
+        itself.
+
+        Returns:
+            A `np.float32` array of voltages.
+        """
+        if refresh_header or channel not in self._volts_conversion:
+            self._volts_conversion_update()
+        lut = self._volts_conversion.get(channel)
+        if lut is None:
+            raise ValueError(f"Screen header has no channel {channel.value}")
+        return lut[self.screen_values(channel).view(np.uint8)]
+
+    def _volts_conversion_update(self) -> None:
+        """Parse the screen header into per channel volts lookup tables."""
+        header = self.screen_header()
+        self._volts_conversion.clear()
+        for ch in header["CHANNEL"]:
+            try:
+                channel = Channel[ch["NAME"]]
+            except KeyError:
+                raise ValueError(f"Unknown channel: {ch['NAME']}") from None
+            probe, units = utils.split_float_units(ch["PROBE"])
+            if units != "X":
+                raise ValueError(f"Unknown probe attenuation: {ch['PROBE']}")
+            scale = _quantity(ch["SCALE"]).m_as("V")
+            self._volts_conversion[channel] = voltage_lut(
+                probe, scale, int(ch["OFFSET"])
+            )
+
+    def screen_values_async(self, channel: Channel) -> Future[np.ndarray]:
+        """Queue a `screen_values` fetch on the transport's background IO thread.
+
+        Queue the header and all channels before waiting on any of them to
+        pipeline the transfers while the caller processes earlier data.
+        """
+        return self._device.scpi.submit(self.screen_values, channel)
+
+    def stream_screen(self, channel: Channel, depth: int = 4) -> Iterator[np.ndarray]:
+        """Continuously yield `screen_values` captures for a given channel.
+
+        Up to `depth` captures are kept queued on the transport's background
+        IO thread, so the device transfer overlaps with whatever the consumer
+        does between iterations (plotting, analysis). A yielded capture may be
+        up to `depth` captures older than the live screen.
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        pending = deque(self.screen_values_async(channel) for _ in range(depth))
+        try:
+            while True:
+                values = pending.popleft().result()
+                pending.append(self.screen_values_async(channel))
+                yield values
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def screen_header_async(
+        self,
+    ) -> Future[dict[str, str | dict[str, Any] | list[dict[str, Any]]]]:
+        """Queue a `screen_header` fetch on the transport's background IO thread."""
+        return self._device.scpi.submit(self.screen_header)
+
     class HorizontalScale(Enum):
         """Horizontal scale values for the oscilloscope."""
 
@@ -282,7 +413,7 @@ class OwonOscilloscope:
             return list(cls)
 
         def quantity(self) -> pint.Quantity:
-            return pint.Quantity(self.value)
+            return _quantity(self.value)
 
     def horizontal_div_scale_get(self) -> HorizontalScale:
         """Fetch the horizontal division scale."""
@@ -306,6 +437,24 @@ class OwonOscilloscope:
         """Set the horizontal division offset."""
         self._device.scpi.set(f":HORIzontal:OFFSet {offset}")
 
+    def horizontal_state_get(self) -> tuple[HorizontalScale, float, pint.Quantity]:
+        """Fetch the horizontal scale and offset in a single round trip.
+
+        Returns:
+            The division scale, the division offset, and the real time offset.
+        """
+        data = self._device.scpi.query(":HORIzontal:SCALe?;:HORIzontal:OFFSet?")
+        if not data:
+            raise ValueError(f"No data received for horizontal state")
+        # Responses to compound queries are returned as one line, separated by
+        # ";" (IEEE 488.2).
+        parts = data.split(";")
+        if len(parts) != 2:
+            raise ValueError(f"Invalid horizontal state response '{data}'")
+        scale = self.HorizontalScale(parts[0])
+        offset = float(parts[1])
+        return scale, offset, horizontal_offset_real(scale, offset)
+
     class ChannelCoupling(Enum):
         """Channel input signal coupling mode."""
 
@@ -315,14 +464,16 @@ class OwonOscilloscope:
 
     def channel_coupling_get(self, channel: Channel) -> ChannelCoupling:
         """Fetch the channel input signal coupling mode."""
-        data = self._device.scpi.query(f":CH{channel.value}:COUPling?")
+        data = self._device.scpi.query(self._QUERY_COUPLING[channel])
         if not data:
             raise ValueError(f"No data received for channel {channel.value} coupling")
         return self.ChannelCoupling(data)
 
     def channel_coupling_set(self, channel: Channel, coupling: ChannelCoupling) -> None:
         """Set the channel input signal coupling mode."""
-        self._device.scpi.set(f":CH{channel.value}:COUPling {coupling.value}")
+        self._device.scpi.set(
+            f":CH{_CHANNEL_NUMBER[channel]}:COUPling {coupling.value}"
+        )
 
     class ChannelProbeAttenuation(Enum):
         """Probe attenuation values."""
@@ -337,9 +488,18 @@ class OwonOscilloscope:
             return f"{self.value}X"
 
         def order(self) -> int:
-            if not hasattr(self, "_all"):
-                self._all = list(self.__class__)
-            return self._all.index(self)
+            """Return the zero-based order of magnitude of this attenuation."""
+            return type(self)._ORDER[self]
+
+    # Built once after the enum exists, since members can't reference their
+    # own class during definition.
+    ChannelProbeAttenuation._ORDER = {
+        atten: i for i, atten in enumerate(ChannelProbeAttenuation)
+    }
+    # Device responses look like "10X".
+    ChannelProbeAttenuation._FROM_STR = {
+        f"{atten.value}X": atten for atten in ChannelProbeAttenuation
+    }
 
     class ChannelVerticalScale(Enum):
         # X1
@@ -375,19 +535,23 @@ class OwonOscilloscope:
             return list(cls)
 
         @classmethod
+        @functools.cache
         def scales_by_attenuation(
             cls, atten: "OwonOscilloscope.ChannelProbeAttenuation"
-        ) -> list[Self]:
-            """Return available vertical scales for a given probe attenuation."""
+        ) -> tuple[Self, ...]:
+            """Return available vertical scales for a given probe attenuation.
+
+            The result is cached, so it is returned as an immutable tuple.
+            """
             atten_ord_mag = atten.order()
-            return cls.all()[atten_ord_mag * 3 : 10 + (atten_ord_mag * 3)]
+            return tuple(cls.all()[atten_ord_mag * 3 : 10 + (atten_ord_mag * 3)])
 
         def quantity(self) -> pint.Quantity:
-            return pint.Quantity(self.value)
+            return _quantity(self.value)
 
     def channel_vertical_scale_get(self, channel: Channel) -> str:
         """Fetch the vertical scale for a given channel."""
-        data = self._device.scpi.query(f":CH{channel.value}:SCALe?")
+        data = self._device.scpi.query(self._QUERY_VERTICAL_SCALE[channel])
         if not data:
             raise ValueError(
                 f"No data received for channel {channel.value} vertical scale"
@@ -398,29 +562,33 @@ class OwonOscilloscope:
         self, channel: Channel, scale: ChannelVerticalScale
     ) -> None:
         """Set the vertical scale for a given channel."""
-        self._device.scpi.set(f":CH{channel.value}:SCALe {scale.value}")
+        self._device.scpi.set(f":CH{_CHANNEL_NUMBER[channel]}:SCALe {scale.value}")
+        self._volts_conversion.pop(channel, None)
 
     def channel_probe_attenuation_get(
         self, channel: Channel
     ) -> ChannelProbeAttenuation:
         """Fetch the probe attenuation for a given channel."""
-        data = self._device.scpi.query(f":CH{channel.value}:PROB?")
+        data = self._device.scpi.query(self._QUERY_PROBE[channel])
         if not data:
             raise ValueError(
                 f"No data received for channel {channel.value} probe attenuation"
             )
-        order = int(data[:-1])
-        return self.ChannelProbeAttenuation(order)
+        atten = self.ChannelProbeAttenuation._FROM_STR.get(data)
+        if atten is None:
+            raise ValueError(f"Unknown probe attenuation '{data}'")
+        return atten
 
     def channel_probe_attenuation_set(
         self, channel: Channel, atten: ChannelProbeAttenuation
     ) -> None:
         """Set the probe attenuation for a given channel."""
-        self._device.scpi.set(f":CH{channel.value}:PROBe {atten.value}X")
+        self._device.scpi.set(f":CH{_CHANNEL_NUMBER[channel]}:PROBe {atten.value}X")
+        self._volts_conversion.pop(channel, None)
 
     def channel_display_get(self, channel: Channel) -> bool:
         """Fetch the display state for a given channel."""
-        data = self._device.scpi.query(f":CH{channel.value}:DISPlay?")
+        data = self._device.scpi.query(self._QUERY_DISPLAY[channel])
         if not data:
             raise ValueError(f"No data received for channel {channel.value} display")
         return data == "ON"
@@ -428,7 +596,7 @@ class OwonOscilloscope:
     def channel_display_set(self, channel: Channel, display: bool) -> None:
         """Set the display state for a given channel."""
         display_str = "ON" if display else "OFF"
-        self._device.scpi.set(f":CH{channel.value}:DISPlay {display_str}")
+        self._device.scpi.set(f":CH{_CHANNEL_NUMBER[channel]}:DISPlay {display_str}")
 
 
 def horizontal_offset_real(
@@ -447,72 +615,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
-# %%
-if "device" in locals():
-    device.close()
-device = OwonDevice()
-device.oscope.horizontal_div_scale_get()
-device.oscope.horizontal_div_offset_get()
-horizontal_offset_real(
-    device.oscope.horizontal_div_scale_get(),
-    device.oscope.horizontal_div_offset_get(),
-)
-
-# %%
-OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
-    OwonOscilloscope.ChannelProbeAttenuation.Atten_1X
-)
-
-# %%
-OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
-    OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
-)
-
-# device.oscope.channel_vertical_scale_get(Channel.CH1)
-
-# %%
-device.oscope.channel_probe_attenuation_set(
-    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_1X
-)
-print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
-device.oscope.channel_probe_attenuation_set(
-    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
-)
-print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
-device.oscope.channel_probe_attenuation_set(
-    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_100X
-)
-print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
-device.oscope.channel_probe_attenuation_set(
-    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_1000X
-)
-print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
-device.oscope.channel_probe_attenuation_set(
-    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_10000X
-)
-print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
-
-# %% Test Probe Coupling
-device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.GND)
-print(device.oscope.channel_coupling_get(Channel.CH1))
-device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.AC)
-print(device.oscope.channel_coupling_get(Channel.CH1))
-device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.DC)
-print(device.oscope.channel_coupling_get(Channel.CH1))
-
-# %% Test Channel Display
-device.oscope.channel_display_set(Channel.CH1, True)
-print(device.oscope.channel_display_get(Channel.CH1))
-time.sleep(1)
-device.oscope.channel_display_set(Channel.CH1, False)
-print(device.oscope.channel_display_get(Channel.CH1))
-time.sleep(1)
-device.oscope.channel_display_set(Channel.CH1, True)
-print(device.oscope.channel_display_get(Channel.CH1))
-
-
-# %%
-device.close()
-
-# %%
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Interactive demo cells for the OWON HDS200 oscilloscope interface.
+
+Run the `# %%` cells one at a time from an editor with Jupyter-style cell
+support. These cells talk to a connected device, so they live outside of
+owon_oscilloscope_hds200.py to keep importing that module free of side effects.
+"""
+
+# %% Imports
+
+import time
+
+from owon_oscilloscope_hds200 import Channel, OwonDevice, OwonOscilloscope
+
+# %%
+if "device" in locals():
+    device.close()
+device = OwonDevice()
+device.oscope.horizontal_state_get()
+
+# %%
+OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
+    OwonOscilloscope.ChannelProbeAttenuation.Atten_1X
+)
+
+# %%
+OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
+    OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
+)
+
+# device.oscope.channel_vertical_scale_get(Channel.CH1)
+
+# %%
+device.oscope.channel_probe_attenuation_set(
+    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_1X
+)
+print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
+device.oscope.channel_probe_attenuation_set(
+    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
+)
+print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
+device.oscope.channel_probe_attenuation_set(
+    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_100X
+)
+print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
+device.oscope.channel_probe_attenuation_set(
+    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_1000X
+)
+print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
+device.oscope.channel_probe_attenuation_set(
+    Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_10000X
+)
+print(device.oscope.channel_probe_attenuation_get(Channel.CH1))
+
+# %% Test Probe Coupling
+device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.GND)
+print(device.oscope.channel_coupling_get(Channel.CH1))
+device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.AC)
+print(device.oscope.channel_coupling_get(Channel.CH1))
+device.oscope.channel_coupling_set(Channel.CH1, OwonOscilloscope.ChannelCoupling.DC)
+print(device.oscope.channel_coupling_get(Channel.CH1))
+
+# %% Test Channel Display
+device.oscope.channel_display_set(Channel.CH1, True)
+print(device.oscope.channel_display_get(Channel.CH1))
+time.sleep(1)
+device.oscope.channel_display_set(Channel.CH1, False)
+print(device.oscope.channel_display_get(Channel.CH1))
+time.sleep(1)
+device.oscope.channel_display_set(Channel.CH1, True)
+print(device.oscope.channel_display_get(Channel.CH1))
+
+
+# %%
+device.close()
+
+# %%
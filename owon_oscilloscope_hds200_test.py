@@ -3,9 +3,14 @@
 Tests for the OWON oscilloscope interface.
 """
 
+import json
+import threading
 import unittest
 
+import numpy as np
+
 from owon_oscilloscope_hds200 import *
+from owon_scpi_base_test import FakeSCPI
 
 
 class TestDeviceIdentification(unittest.TestCase):
@@ -65,27 +70,231 @@ class TestDeviceIdentification(unittest.TestCase):
         )
 
 
+class FakeDevice:
+    """Stand-in for OwonDevice that talks to a FakeSCPI transport."""
+
+    def __init__(self, responses: list[bytes]) -> None:
+        self.scpi = FakeSCPI(responses)
+
+
+def packet(payload: bytes) -> bytes:
+    """Prefix a payload with its 4 byte little-endian length header."""
+    return len(payload).to_bytes(4, "little") + payload
+
+
+def screen_header(ch1_scale: str) -> bytes:
+    """Build a screen header packet with a 10X probe on CH1."""
+    return packet(
+        json.dumps(
+            {
+                "CHANNEL": [
+                    {"NAME": "CH1", "PROBE": "10X", "SCALE": ch1_scale, "OFFSET": 2},
+                    {"NAME": "CH2", "PROBE": "1X", "SCALE": "1.0V", "OFFSET": 0},
+                ]
+            }
+        ).encode()
+    )
+
+
+class TestOwonOscilloscopeOffline(unittest.TestCase):
+    """Test suite for OwonOscilloscope against canned device responses."""
+
+    def make_oscope(self, responses: list[bytes]) -> OwonOscilloscope:
+        self.device = FakeDevice(responses)
+        return OwonOscilloscope(self.device)
+
+    def test_horizontal_state_get(self):
+        """Test parsing the ";" separated compound horizontal response."""
+        oscope = self.make_oscope([b"2.0ms;1.5\n"])
+        scale, offset, real = oscope.horizontal_state_get()
+        self.assertEqual(scale, OwonOscilloscope.HorizontalScale.Time_2ms)
+        self.assertEqual(offset, 1.5)
+        self.assertAlmostEqual(real.m_as("ms"), 3.0)
+        self.assertEqual(
+            self.device.scpi.written, [b":HORIzontal:SCALe?;:HORIzontal:OFFSet?\n"]
+        )
+
+    def test_horizontal_state_get_malformed(self):
+        """Test that a response without both values is rejected."""
+        oscope = self.make_oscope([b"2.0ms\n"])
+        with self.assertRaises(ValueError):
+            oscope.horizontal_state_get()
+
+    def test_channel_probe_attenuation_get(self):
+        """Test parsing the probe attenuation response."""
+        oscope = self.make_oscope([b"10X\n"])
+        self.assertEqual(
+            oscope.channel_probe_attenuation_get(Channel.CH1),
+            OwonOscilloscope.ChannelProbeAttenuation.Atten_10X,
+        )
+        self.assertEqual(self.device.scpi.written, [b":CH1:PROB?\n"])
+
+    def test_channel_probe_attenuation_get_unknown(self):
+        """Test that an unknown probe attenuation is rejected."""
+        oscope = self.make_oscope([b"7X\n"])
+        with self.assertRaises(ValueError):
+            oscope.channel_probe_attenuation_get(Channel.CH2)
+
+    def test_quantity_not_shared(self):
+        """Test that converting a returned quantity in place does not leak."""
+        quantity = OwonOscilloscope.HorizontalScale.Time_2ms.quantity()
+        quantity.ito("s")
+        self.assertEqual(
+            str(OwonOscilloscope.HorizontalScale.Time_2ms.quantity().units),
+            "millisecond",
+        )
+
+    def test_channel_probe_attenuation_set(self):
+        """Test the exact command written to set the probe attenuation."""
+        oscope = self.make_oscope([])
+        oscope.channel_probe_attenuation_set(
+            Channel.CH2, OwonOscilloscope.ChannelProbeAttenuation.Atten_100X
+        )
+        self.assertEqual(self.device.scpi.written, [b":CH2:PROBe 100X\n"])
+
+    def test_screen_values_volts(self):
+        """Test converting screen values with the header's lookup table."""
+        samples = packet(bytes([2, 27, 0xE9]))
+        oscope = self.make_oscope([screen_header("100mV"), samples, samples])
+        volts = oscope.screen_values_volts(Channel.CH1)
+        self.assertEqual(volts.dtype, np.float32)
+        np.testing.assert_allclose(volts, [0.0, 1.0, -1.0], atol=1e-6)
+        # The header conversion is cached, so only the samples are fetched.
+        np.testing.assert_allclose(
+            oscope.screen_values_volts(Channel.CH1), [0.0, 1.0, -1.0], atol=1e-6
+        )
+        self.assertEqual(
+            self.device.scpi.written,
+            [
+                b":DATa:WAVe:SCReen:HEAD?\n",
+                b":DATa:WAVe:SCReen:ch1?\n",
+                b":DATa:WAVe:SCReen:ch1?\n",
+            ],
+        )
+
+    def test_screen_values_volts_missing_channel(self):
+        """Test that a channel missing from the screen header is rejected."""
+        header = packet(
+            json.dumps(
+                {
+                    "CHANNEL": [
+                        {"NAME": "CH1", "PROBE": "1X", "SCALE": "1.0V", "OFFSET": 0}
+                    ]
+                }
+            ).encode()
+        )
+        oscope = self.make_oscope([header])
+        with self.assertRaisesRegex(ValueError, "channel 2"):
+            oscope.screen_values_volts(Channel.CH2)
+
+    def test_screen_values_volts_unknown_channel(self):
+        """Test that an unknown channel name in the screen header is rejected."""
+        header = packet(
+            json.dumps(
+                {
+                    "CHANNEL": [
+                        {"NAME": "CH9", "PROBE": "1X", "SCALE": "1.0V", "OFFSET": 0}
+                    ]
+                }
+            ).encode()
+        )
+        oscope = self.make_oscope([header])
+        with self.assertRaisesRegex(ValueError, "CH9"):
+            oscope.screen_values_volts(Channel.CH1)
+
+    def test_setters_invalidate_volts_conversion(self):
+        """Test that channel setters force the header to be fetched again."""
+        samples = packet(bytes([27]))
+        oscope = self.make_oscope(
+            [screen_header("100mV"), samples, screen_header("200mV"), samples]
+        )
+        self.assertAlmostEqual(float(oscope.screen_values_volts(Channel.CH1)[0]), 1.0)
+        oscope.channel_vertical_scale_set(
+            Channel.CH1, OwonOscilloscope.ChannelVerticalScale.Volt_200mv
+        )
+        self.assertAlmostEqual(float(oscope.screen_values_volts(Channel.CH1)[0]), 2.0)
+
+        oscope = self.make_oscope(
+            [screen_header("100mV"), samples, screen_header("100mV"), samples]
+        )
+        oscope.screen_values_volts(Channel.CH1)
+        oscope.channel_probe_attenuation_set(
+            Channel.CH1, OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
+        )
+        oscope.screen_values_volts(Channel.CH1)
+        self.assertEqual(
+            self.device.scpi.written.count(b":DATa:WAVe:SCReen:HEAD?\n"), 2
+        )
+
+    def test_stream_screen_order(self):
+        """Test that streamed captures are yielded in capture order."""
+        oscope = self.make_oscope([packet(bytes([i])) for i in range(5)])
+        stream = oscope.stream_screen(Channel.CH1, depth=2)
+        self.assertEqual([next(stream).tolist() for _ in range(3)], [[0], [1], [2]])
+        stream.close()
+        self.device.scpi._shutdown_executor()
+
+    def test_stream_screen_close_cancels_pending(self):
+        """Test that closing the stream cancels captures not yet started."""
+        gate = threading.Event()
+        blocked = threading.Event()
+        oscope = self.make_oscope([packet(bytes([i])) for i in range(4)])
+        scpi = self.device.scpi
+        read_bytes = scpi._read_bytes
+
+        def gated_read_bytes(size: int, timeout_ms: int) -> bytes:
+            # Hold every capture after the first one on the IO thread.
+            if len(scpi.written) > 1:
+                blocked.set()
+                gate.wait()
+            return read_bytes(size, timeout_ms)
+
+        scpi._read_bytes = gated_read_bytes
+        futures = []
+        screen_values_async = oscope.screen_values_async
+
+        def recording_screen_values_async(channel: Channel):
+            futures.append(screen_values_async(channel))
+            return futures[-1]
+
+        oscope.screen_values_async = recording_screen_values_async
+        stream = oscope.stream_screen(Channel.CH1, depth=3)
+        self.assertEqual(next(stream).tolist(), [0])
+        self.assertTrue(blocked.wait(timeout=5))
+        stream.close()
+        gate.set()
+        scpi._shutdown_executor()
+        # The second capture was already running; the rest were still queued.
+        self.assertFalse(futures[1].cancelled())
+        self.assertTrue(all(future.cancelled() for future in futures[2:]))
+        self.assertEqual(len(futures), 4)
+
+
 class TestOwonOscilloscope(unittest.TestCase):
     """Test suite for the OWON oscilloscope interface."""
 
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.device = OwonDevice()
+    @classmethod
+    def setUpClass(cls):
+        """Connect once and share the device across all test methods."""
+        try:
+            cls.device = OwonDevice()
+        except (OSError, ValueError) as e:
+            raise unittest.SkipTest(f"Device not connected: {e}")
         # Verify device is HDS200 series before running tests
-        id_info = self.device.identify()
-        if not id_info.is_hds200():
-            self.device.close()
-            self.skipTest("Device is not an HDS200 series oscilloscope")
+        if not cls.device.id.is_hds200():
+            cls.device.close()
+            raise unittest.SkipTest("Device is not an HDS200 series oscilloscope")
 
-    def tearDown(self):
-        """Clean up after each test method."""
-        if hasattr(self, "device"):
-            self.device.close()
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared device connection."""
+        cls.device.close()
 
     def test_device_identification(self):
         """Test device identification retrieval."""
-        id_info = self.device.identify()
+        id_info = self.device.id
         self.assertIsInstance(id_info, DeviceIdentification)
+        self.assertIs(self.device.identify(), id_info)
         self.assertIsInstance(id_info.manufacturer, str)
         self.assertIsInstance(id_info.model, str)
         self.assertIsInstance(id_info.serial_number, str)
@@ -128,10 +337,25 @@ class TestOwonOscilloscope(unittest.TestCase):
         ]
 
         for atten in test_attenuations:
-            self.device.oscope.channel_probe_attenuation_set(channel, atten)
-            self.assertEqual(
-                self.device.oscope.channel_probe_attenuation_get(channel), atten
+            # Set and read back in a single round trip.
+            resp = self.device.scpi.query_batch(
+                [
+                    f":CH{channel.value}:PROBe {atten.value}X",
+                    f":CH{channel.value}:PROB?",
+                ]
             )
+            self.assertEqual(resp, f"{atten.value}X")
+
+        # Round trip once per channel through the public API.
+        for channel in Channel:
+            for atten in [
+                OwonOscilloscope.ChannelProbeAttenuation.Atten_10X,
+                OwonOscilloscope.ChannelProbeAttenuation.Atten_1X,
+            ]:
+                self.device.oscope.channel_probe_attenuation_set(channel, atten)
+                self.assertEqual(
+                    self.device.oscope.channel_probe_attenuation_get(channel), atten
+                )
 
     def test_channel_coupling(self):
         """Test channel coupling operations."""
@@ -168,14 +392,14 @@ class TestOwonOscilloscope(unittest.TestCase):
         scales_1x = OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
             OwonOscilloscope.ChannelProbeAttenuation.Atten_1X
         )
-        self.assertIsInstance(scales_1x, list)
+        self.assertIsInstance(scales_1x, tuple)
         self.assertTrue(len(scales_1x) > 0)
 
         # Test scales for 10X attenuation
         scales_10x = OwonOscilloscope.ChannelVerticalScale.scales_by_attenuation(
             OwonOscilloscope.ChannelProbeAttenuation.Atten_10X
         )
-        self.assertIsInstance(scales_10x, list)
+        self.assertIsInstance(scales_10x, tuple)
         self.assertTrue(len(scales_10x) > 0)
 
     def test_screen_data(self):
@@ -184,15 +408,22 @@ class TestOwonOscilloscope(unittest.TestCase):
 
         # Test getting screen values
         values = self.device.oscope.screen_values(channel)
-        self.assertIsInstance(values, list)
-        self.assertTrue(len(values) > 0)
-        self.assertTrue(all(isinstance(v, int) for v in values))
+        self.assertIsInstance(values, np.ndarray)
+        self.assertEqual(values.dtype, np.int8)
+        self.assertEqual(values.size, 600)
 
         # Test getting screen header
         header = self.device.oscope.screen_header()
         self.assertIsInstance(header, dict)
         self.assertTrue(len(header) > 0)
 
+    def test_screen_values_volts(self):
+        """Test screen data conversion to volts."""
+        volts = self.device.oscope.screen_values_volts(Channel.CH1)
+        self.assertIsInstance(volts, np.ndarray)
+        self.assertEqual(volts.dtype, np.float32)
+        self.assertEqual(volts.size, 600)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,14 +4,55 @@ Shared SCPI transport abstractions and utilities for OWON devices.
 """
 
 import argparse
+import asyncio
+import functools
+import itertools
 import json
+import struct
+import threading
 import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Literal, Self, overload
 
+import numpy as np
+
 import utils
 
+try:
+    # orjson is optional, but parses the screen header JSON much faster.
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Little-endian unsigned 32-bit payload length prefixed to binary responses.
+LENGTH_HEADER = struct.Struct("<I")
+
+# Pre-encoded commands that are sent repeatedly.
+CMD_IDN = b"*IDN?\n"
+CMD_SCREEN_CH1 = b":DATa:WAVe:SCReen:CH1?\n"
+
+# Largest payload length a response packet header may plausibly specify.
+UNREASONABLE_PACKET_HEADER_LENGTH = 4096
+
+# Scale factors from the voltage units reported by the device to volts.
+VOLTS_PER_UNIT = {"kV": 1e3, "V": 1.0, "mV": 1e-3, "uV": 1e-6}
+
+
+# Reused indenting encoder for the CLI json print mode.
+_pretty_json = json.JSONEncoder(indent=4).encode
+
+# Decoders from a response payload view to the value returned by `query`, by
+# `data_type`. int8 views the packet as signed samples, without copying the
+# payload out or decoding per byte.
+_DECODERS: dict[str, Callable[[memoryview], Any]] = {
+    "str": lambda payload: str(payload, "ascii"),
+    "bin": bytes,
+    "int8": lambda payload: np.frombuffer(payload, dtype=np.int8),
+    "json": lambda payload: _json_loads(bytes(payload)),
+}
+
 
 class OwonSCPIBase(ABC):
     """Shared SCPI command/query behavior and common CLI."""
@@ -25,6 +66,14 @@ class OwonSCPIBase(ABC):
         """
         self._timeout = timeout
         self.max_response_size = max_response_size
+        # Serializes command/response pairs between the caller and the
+        # background IO thread used by submit().
+        self._io_lock = threading.RLock()
+        # Created up front so concurrent submit() calls share one worker. The
+        # worker thread itself is only started by the first submission.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{type(self).__name__}-io"
+        )
 
     @abstractmethod
     def _write_bytes(self, data: bytes) -> None:
@@ -32,18 +81,46 @@ class OwonSCPIBase(ABC):
 
     @abstractmethod
     def _read_bytes(self, size: int, timeout_ms: int) -> bytes:
-        """Read up to `size` bytes from the underlying transport."""
+        """Read up to `size` bytes from the underlying transport.
+
+        Returns empty bytes if the timeout expires before any data arrives.
+        """
 
     @abstractmethod
     def close(self) -> bool:
         """Close the transport."""
 
-    def _send_command(self, command: str) -> bool:
-        """Send a SCPI command to the device."""
+    def _read_packet(self, length_header: bool) -> bytes:
+        """Read one raw response packet, including its framing.
+
+        The default reads up to `max_response_size` bytes in one shot, which
+        suits transports whose reads complete at the end of a transfer, like
+        USB bulk. It is still faster than reading the 4 byte header
+        separately. Stream transports should override this to stop at the
+        packet boundary rather than waiting for the read timeout.
+        """
+        return self._read_bytes(self.max_response_size, self._timeout)
+
+    def _discard_input(self) -> None:
+        """Read and drop transport input until a read times out.
+
+        Used to resynchronize after a failed exchange, so response packets
+        still in flight are not taken as the answer to the next query.
+        """
+        while self._read_bytes(self.max_response_size, self._timeout):
+            pass
+
+    def _send_command(self, command: str | bytes) -> bool:
+        """Send a SCPI command to the device.
+
+        Commands may be given as pre-encoded, newline terminated ASCII bytes,
+        like `CMD_IDN`, which are written as is. String commands are encoded
+        and terminated through the `encode_command` cache.
+        """
         try:
-            if not command.endswith("\n"):
-                command += "\n"
-            self._write_bytes(command.encode("ascii"))
+            if isinstance(command, str):
+                command = encode_command(command)
+            self._write_bytes(command)
             return True
         except Exception as e:
             print(f"Error sending command: {e}")
@@ -81,35 +158,47 @@ class OwonSCPIBase(ABC):
         Notes:
             We assume that all large reads will succeed.
         """
-        # It is still faster to read the largest block of data in one shot,
-        # so we do not read the 4 byte header separately.
-        try:
-            data = self._read_bytes(self.max_response_size, self._timeout)
-            if not data:
-                raise TimeoutError("Timeout")
-            if not bypass_length_checks:
-                data = parse_and_validate_packet(data, length_header)
-            if length_header and bypass_length_checks:
-                data = data[4:]
-        except TimeoutError:
-            print("Timeout")
+        data = self._read_payload(length_header, bypass_length_checks)
+        if data is None:
             return None
-
+        # Copy the payload out of the packet only once.
         if binary:
-            return data
-        return data.decode("ascii")
+            return bytes(data)
+        return str(data, "ascii")
+
+    def _read_payload(
+        self, length_header: bool = False, bypass_length_checks: bool = False
+    ) -> memoryview | None:
+        """Read a response packet and return a zero-copy view of its payload.
+
+        Consumers that accept the buffer protocol, like `np.frombuffer`, can
+        use the view directly and skip copying the payload out of the packet.
+        """
+        if bypass_length_checks:
+            raw = self._read_bytes(self.max_response_size, self._timeout)
+        else:
+            raw = self._read_packet(length_header)
+        if not raw:
+            print("Timeout")
+            return None
+        if not bypass_length_checks:
+            return parse_and_validate_packet(raw, length_header)
+        if length_header:
+            return memoryview(raw)[4:]
+        return memoryview(raw)
 
-    def set(self, command: str) -> bool:
+    def set(self, command: str | bytes) -> bool:
         """Send a command to the device.
 
         TODO: Add the ability to wait/poll until the setting takes effect.
         """
-        return self._send_command(command)
+        with self._io_lock:
+            return self._send_command(command)
 
     @overload
     def query(
         self,
-        command: str,
+        command: str | bytes,
         data_type: Literal["bin"],
         length_header: bool = False,
         bypass_length_checks: bool = False,
@@ -118,7 +207,7 @@ class OwonSCPIBase(ABC):
     @overload
     def query(
         self,
-        command: str,
+        command: str | bytes,
         data_type: Literal["str"] = "str",
         length_header: bool = False,
         bypass_length_checks: bool = False,
@@ -127,16 +216,16 @@ class OwonSCPIBase(ABC):
     @overload
     def query(
         self,
-        command: str,
+        command: str | bytes,
         data_type: Literal["int8"],
         length_header: Literal[True],
         bypass_length_checks: bool = False,
-    ) -> list[int] | None: ...
+    ) -> np.ndarray | None: ...
 
     @overload
     def query(
         self,
-        command: str,
+        command: str | bytes,
         data_type: Literal["json"],
         length_header: Literal[True],
         bypass_length_checks: bool = False,
@@ -144,53 +233,151 @@ class OwonSCPIBase(ABC):
 
     def query(
         self,
-        command: str,
+        command: str | bytes,
         data_type: Literal["str", "bin", "int8", "json"] = "str",
         length_header: bool = False,
         bypass_length_checks: bool = False,
-    ) -> bytes | str | list[int] | Any | None:
+    ) -> bytes | str | np.ndarray | Any | None:
         """Send a command and return the response.
 
-        TODO: Add ability to handle concatenated commands with multiple responses.
+        Use `query_batch` or `query_binary_batch` for compound commands.
         """
+        decoder = _DECODERS.get(data_type)
+        if decoder is None:
+            raise ValueError(f"Unsupported data_type: {data_type}")
         if data_type == "int8" and not length_header:
             raise ValueError("int8 data type requires length_header=True")
 
-        if not self._send_command(command):
-            return None
-        # The time between sending the command and receiving the response is
-        # somewhat delicate. Adding any delays will cause the response to be
-        # missing some initial data. Starting the receive after sending the
-        # command does create a race condition, but luckily the oscope device
-        # is slow and takes more than 10ms to start responding.
-
-        if data_type in ["str", "json"]:
-            resp = self._read_response(
-                binary=False,
+        with self._io_lock:
+            if not self._send_command(command):
+                return None
+            # The time between sending the command and receiving the response is
+            # somewhat delicate. Adding any delays will cause the response to be
+            # missing some initial data. Starting the receive after sending the
+            # command does create a race condition, but luckily the oscope device
+            # is slow and takes more than 10ms to start responding.
+            payload = self._read_payload(
                 length_header=length_header,
                 bypass_length_checks=bypass_length_checks,
             )
-            if not resp:
+        if not payload:
+            return None
+        return decoder(payload)
+
+    def query_batch(self, commands: list[str]) -> str | None:
+        """Send several commands as one compound SCPI line and read the response.
+
+        The commands are joined with `;`, so a set followed by a query, like
+        `[":CH1:PROBe 10X", ":CH1:PROB?"]`, costs a single round trip. Only
+        the last command should be a query, since the device only returns one
+        response line.
+        """
+        if not commands:
+            raise ValueError("query_batch requires at least one command")
+        with self._io_lock:
+            if not self._send_command(";".join(commands)):
                 return None
-            if data_type == "str":
-                return resp
-            return json.loads(resp)
+            resp = self._read_response(binary=False)
+        if not resp:
+            return None
+        return resp
 
-        if data_type in ["bin", "int8"]:
-            resp = self._read_response(
-                binary=True,
-                length_header=length_header,
-                bypass_length_checks=bypass_length_checks,
-            )
-            if not resp:
+    def query_binary_batch(self, commands: list[str]) -> list[bytes] | None:
+        """Send several length prefixed queries as one compound SCPI line.
+
+        The device answers a compound query with one length prefixed packet
+        per command, back to back. For example,
+        `[":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]` fetches both
+        channels with a single round trip.
+
+        Returns:
+            The payload of each response, in command order, or None on a
+            timeout. Any remaining input is discarded before returning None or
+            raising, so the next query starts in sync with the device.
+        """
+        if not commands:
+            raise ValueError("query_binary_batch requires at least one command")
+        with self._io_lock:
+            if not self._send_command(";".join(commands)):
                 return None
-            if data_type == "bin":
-                return resp
-            return [
-                int.from_bytes([byte], byteorder="big", signed=True) for byte in resp
-            ]
+            # A transport read may end at a packet boundary (serial) or hold
+            # several packets (USB bulk), so buffer reads and split packets off
+            # the front as they complete.
+            buffer = bytearray()
+            start = 0
+            payloads: list[bytes] = []
+            while len(payloads) < len(commands):
+                if len(buffer) - start >= LENGTH_HEADER.size:
+                    (length,) = LENGTH_HEADER.unpack_from(buffer, start)
+                    # Reject a bad header now, rather than waiting out the
+                    # timeout for a payload that will never arrive.
+                    if not 0 < length <= UNREASONABLE_PACKET_HEADER_LENGTH:
+                        self._discard_input()
+                        _validate_length_header_packet(memoryview(buffer)[start:])
+                    end = start + LENGTH_HEADER.size + length
+                    if len(buffer) >= end:
+                        with memoryview(buffer) as view:
+                            payloads.append(
+                                bytes(view[start + LENGTH_HEADER.size : end])
+                            )
+                        start = end
+                        continue
+                raw = self._read_packet(length_header=True)
+                if not raw:
+                    print("Timeout")
+                    # Later packets may still arrive after the timeout.
+                    self._discard_input()
+                    return None
+                buffer += raw
+            if extra := len(buffer) - start:
+                print(
+                    f"Received {extra} extra bytes past the last response "
+                    "packet. This may be a program bug."
+                )
+        return payloads
+
+    def submit[R](
+        self, fn: Callable[..., R], /, *args: Any, **kwargs: Any
+    ) -> Future[R]:
+        """Run `fn` on a single background IO thread and return its future.
+
+        This allows the caller to process the previous capture while the
+        device is still transferring the next one. Requests are executed in
+        submission order, so issuing several before waiting pipelines them
+        back to back.
+        """
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def submit_query(
+        self,
+        command: str | bytes,
+        data_type: Literal["str", "bin", "int8", "json"] = "str",
+        length_header: bool = False,
+    ) -> Future[bytes | str | np.ndarray | Any | None]:
+        """Queue a `query` on the background IO thread."""
+        return self.submit(self.query, command, data_type, length_header)
 
-        raise ValueError(f"Unsupported data_type: {data_type}")
+    async def aquery(
+        self,
+        command: str | bytes,
+        data_type: Literal["str", "bin", "int8", "json"] = "str",
+        length_header: bool = False,
+    ) -> bytes | str | np.ndarray | Any | None:
+        """Await a `query` run on the background IO thread.
+
+        The event loop stays free to run other tasks while the device
+        responds.
+        """
+        return await asyncio.wrap_future(
+            self.submit_query(command, data_type, length_header)
+        )
+
+    def _shutdown_executor(self) -> None:
+        """Stop the background IO thread, waiting for queued requests.
+
+        Submitting after this raises RuntimeError.
+        """
+        self._executor.shutdown(wait=True)
 
     @classmethod
     def add_cli_arguments(cls, parser: argparse.ArgumentParser) -> None:
@@ -214,11 +401,13 @@ class OwonSCPIBase(ABC):
     def run_cli_loop(self) -> None:
         """Run the shared interactive debug CLI for any transport backend."""
         print("Connected to OWON device.")
-        resp = self.query("*IDN?")
+        resp = self.query(CMD_IDN)
         print(f"Device ID: {resp}")
 
         print_modes: list[str] = ["str", "json", "bin", "int"]
         print_mode: str = "str"
+        # Cleared if the device fails to answer a compound values query.
+        batch_values = True
 
         try:
             while True:
@@ -244,22 +433,40 @@ class OwonSCPIBase(ABC):
                     print(self._read_response())
                     continue
                 if cmd == "values":
-                    query_head = ":DATa:WAVe:SCReen:head?"
-                    query_data_ch1 = ":DATa:WAVe:SCReen:ch1?"
-                    query_data_ch2 = ":DATa:WAVe:SCReen:ch2?"
-
-                    head = self.query(query_head, data_type="json", length_header=True)
-                    response_data_ch1 = self.query(
-                        query_data_ch1, data_type="int8", length_header=True
-                    )
-                    response_data_ch2 = self.query(
-                        query_data_ch2, data_type="int8", length_header=True
-                    )
-                    if not head or not response_data_ch1 or not response_data_ch2:
+                    query_head = ":DATa:WAVe:SCReen:HEAD?"
+                    query_data_ch1 = ":DATa:WAVe:SCReen:CH1?"
+                    query_data_ch2 = ":DATa:WAVe:SCReen:CH2?"
+
+                    # Fetch the header and both channels with one compound
+                    # query, keeping the raw samples so decoding and conversion
+                    # to volts happen in one vectorized pass below.
+                    queries = [query_head, query_data_ch1, query_data_ch2]
+                    packets = None
+                    if batch_values:
+                        try:
+                            packets = self.query_binary_batch(queries)
+                        except ValueError as e:
+                            print(f"Compound query failed: {e}")
+                        if not packets:
+                            # Firmware without compound binary query support.
+                            # A failed batch has already discarded any packets
+                            # still in flight, so the single queries below
+                            # cannot read a stale response.
+                            print("Falling back to one query per command.")
+                            batch_values = False
+                    if not packets:
+                        packets = [
+                            self.query(q, data_type="bin", length_header=True)
+                            for q in queries
+                        ]
+                    if not all(packets):
                         print("Failed to read data from the device.")
                         continue
+                    head_raw, *values = packets
+                    # The header rarely changes between captures, so reuse the
+                    # parse of an identical response.
+                    head = parse_json_cached(head_raw)
 
-                    values: list[list[int]] = [response_data_ch1, response_data_ch2]
                     print(f"Received {len(values[0])} values for ch1.")
                     print(f"Received {len(values[1])} values for ch2.")
 
@@ -290,29 +497,22 @@ class OwonSCPIBase(ABC):
                         )
                         assert units == "X"
                         ch_probe_scale[index], units = utils.split_float_units(scale)
-                        if units == "kV":
-                            ch_probe_scale[index] *= 1000
-                        elif units == "V":
-                            ch_probe_scale[index] *= 1
-                        elif units == "mV":
-                            ch_probe_scale[index] /= 1000
-                        elif units == "uV":
-                            ch_probe_scale[index] /= 1000000
-                        else:
+                        if units not in VOLTS_PER_UNIT:
                             raise ValueError(f"Unknown unit: {units}")
+                        ch_probe_scale[index] *= VOLTS_PER_UNIT[units]
                         ch_offset[index] = int(offset)
                         ch_display[index] = display == "ON"
                         print(
                             f"{ch['NAME']} calculated scale is {ch_probe_scale[index]}V"
                         )
 
-                    ch1_voltage = data_screen_values_to_voltage(
+                    ch1_voltage = data_screen_bytes_to_voltage(
                         values[0],
                         ch_probe_attenuation[0],
                         ch_probe_scale[0],
                         ch_offset[0],
                     )
-                    ch2_voltage = data_screen_values_to_voltage(
+                    ch2_voltage = data_screen_bytes_to_voltage(
                         values[1],
                         ch_probe_attenuation[1],
                         ch_probe_scale[1],
@@ -321,14 +521,12 @@ class OwonSCPIBase(ABC):
 
                     if ch_display[0]:
                         print("Channel 1:")
-                        for row in list_reshape(ch1_voltage, 20):
-                            print(" ".join(f"{v : .3f}V" for v in row))
+                        print("\n".join(voltage_lines(ch1_voltage, 20)))
                     else:
                         print("Channel 1 is off.")
                     if ch_display[1]:
                         print("Channel 2:")
-                        for row in list_reshape(ch2_voltage, 20):
-                            print(" ".join(f"{v : .3f}V" for v in row))
+                        print("\n".join(voltage_lines(ch2_voltage, 20)))
                     else:
                         print("Channel 2 is off.")
                     continue
@@ -336,14 +534,20 @@ class OwonSCPIBase(ABC):
                     print("Benchmark downloading one screen of data.")
                     # Benchmark how long it takes to transfer one screen of data
                     # for a single channel.
-                    query = ":DATa:WAVe:SCReen:CH1?"
-                    start = time.time()
+                    # Each query reads exactly one framed packet, so the time
+                    # measured is the device round trip, not a read timeout.
+                    query = CMD_SCREEN_CH1
+                    failures = 0
+                    start = time.perf_counter()
                     for _ in range(100):
-                        self.query(query, data_type="bin", length_header=True)
-                    end = time.time()
+                        if not self.query(query, data_type="bin", length_header=True):
+                            failures += 1
+                    end = time.perf_counter()
                     print(
                         f"It takes {((end - start) / 100) * 1000 : .3f} ms per screen."
                     )
+                    if failures:
+                        print(f"{failures} of 100 reads failed.")
                     continue
 
                 if print_mode == "str":
@@ -359,7 +563,7 @@ class OwonSCPIBase(ABC):
                     try:
                         # The query will consume the first 4 bytes as data length.
                         resp = self.query(cmd, data_type="json", length_header=True)
-                        print(json.dumps(resp, indent=4))
+                        print(_pretty_json(resp))
                     except json.JSONDecodeError:
                         print("Failed to decode JSON response.")
                 elif print_mode == "bin":
@@ -377,31 +581,49 @@ class OwonSCPIBase(ABC):
                         continue
                     print(f"Received {len(resp)} bytes.")
                     if len(resp) >= 4:
-                        attempted_length = int.from_bytes(
-                            resp[:4], byteorder="little", signed=False
-                        )
+                        (attempted_length,) = LENGTH_HEADER.unpack_from(resp)
                         print(f"First 4 bytes is value {attempted_length}.")
                     # Print hex values with 32 bytes on one line. Add extra space
                     # between each set of 4 bytes.
-                    for row in list_reshape(resp, 32):
-                        for word in list_reshape(row, 4):
-                            print(" ".join(f"{byte:02x}" for byte in word), end="  ")
-                        print()
+                    # Write the whole dump at once rather than one print per line.
+                    print("\n".join(hex_dump_lines(resp, 32, 4)))
                 elif print_mode == "int":
                     # The query will consume the first 4 bytes as data length.
                     resp = self.query(cmd, data_type="int8", length_header=True)
-                    if not resp:
+                    if resp is None:
                         print("Failed to read data from the device.")
                         continue
                     print(f"Received {len(resp)} 8-bit ints.")
-                    print(" ".join(str(v) for v in resp))
+                    # Convert to Python ints in one pass, rather than
+                    # formatting numpy scalars one at a time.
+                    print(" ".join(map(str, resp.tolist())))
         except KeyboardInterrupt:
             print("\nExiting...")
         finally:
             self.close()
 
 
-def parse_and_validate_packet(data: bytes, length_header: bool = False) -> bytes:
+@functools.lru_cache(maxsize=64)
+def encode_command(command: str) -> bytes:
+    """Encode a SCPI command as newline terminated ASCII.
+
+    The same few commands are sent repeatedly, so the encoding is cached.
+    """
+    if not command.endswith("\n"):
+        command += "\n"
+    return command.encode("ascii")
+
+
+@functools.lru_cache(maxsize=8)
+def parse_json_cached(raw: bytes) -> Any:
+    """Parse a JSON response, reusing the result for identical responses.
+
+    The returned object is shared between calls, so treat it as read-only.
+    """
+    return _json_loads(raw)
+
+
+def parse_and_validate_packet(data: bytes, length_header: bool = False) -> memoryview:
     """Parse a response packet and validate its data length.
 
     The primary function is to strip the 4 byte packet length header, which is
@@ -416,56 +638,100 @@ def parse_and_validate_packet(data: bytes, length_header: bool = False) -> bytes
             end.
 
     Returns:
-        The stripped data from the packet.
+        A zero-copy view of the stripped data from the packet.
     """
-    UNREASONABLE_PACKET_HEADER_LENGTH = 4096
+    view = memoryview(data)
 
     if length_header:
         # The first 4 bytes of the packet are the unsigned integer length of
         # the remaining packet data, excluding the header itself.
-        if len(data) < 4:
-            raise ValueError("Received insufficient data to parse length header.")
-        hdr_length = int.from_bytes(data[:4], byteorder="little", signed=False)
-
-        if hdr_length == 0:
-            raise ValueError("Received packet header of 0.")
-        if hdr_length > UNREASONABLE_PACKET_HEADER_LENGTH:
-            raise ValueError(
-                f"Received packet header length, {hdr_length}, is unreasonably large."
-            )
-        # Received too little data compared to expected data.
-        # This may require chunking smaller data reads.
-        if len(data) - 4 < hdr_length:
-            raise ValueError(
-                f"Received {len(data)} bytes, but packet header "
-                f"specified {hdr_length + 4} expected bytes. This may be a "
-                "USB compatibility issue between device and program."
-            )
-        # Received too much data compared to expected data.
-        if len(data) - 4 > hdr_length:
-            print(
-                f"Received {len(data) - 4 - hdr_length} extra bytes than the "
-                f"packet header specified ({hdr_length}). This may be a program bug."
-            )
-        data = data[4 : 4 + hdr_length]
-        assert len(data) > 0
-    else:
-        newline = data.find(b"\n")
-        if newline == -1:
-            raise ValueError("No final newline found in response packet.")
-        if newline != len(data) - 1:
-            print(
-                f"Received {len(data) - newline} extra bytes past the first response "
-                f"newline (index {newline}). This may be a program bug."
-            )
-        data = data[:newline]
-        assert data.find(b"\n") == -1
-    return data
+        if len(data) >= LENGTH_HEADER.size:
+            (hdr_length,) = LENGTH_HEADER.unpack_from(view)
+            end = LENGTH_HEADER.size + hdr_length
+            # Well formed packets take this single check.
+            if len(data) == end and 0 < hdr_length <= UNREASONABLE_PACKET_HEADER_LENGTH:
+                return view[LENGTH_HEADER.size : end]
+        return _validate_length_header_packet(view)
+
+    # One scan finds the terminator; everything after it is surplus.
+    newline = data.find(b"\n")
+    if newline == -1:
+        raise ValueError("No final newline found in response packet.")
+    extra = len(data) - newline - 1
+    if extra:
+        print(
+            f"Received {extra} extra bytes past the first response "
+            f"newline (index {newline}). This may be a program bug."
+        )
+    return view[:newline]
+
+
+def _validate_length_header_packet(view: memoryview) -> memoryview:
+    """Report why a length prefixed packet is malformed.
+
+    This is the slow path of `parse_and_validate_packet`. It raises for
+    unusable packets and warns about, then strips, surplus trailing data.
+    """
+    if len(view) < LENGTH_HEADER.size:
+        raise ValueError("Received insufficient data to parse length header.")
+    (hdr_length,) = LENGTH_HEADER.unpack_from(view)
+
+    if hdr_length == 0:
+        raise ValueError("Received packet header of 0.")
+    if hdr_length > UNREASONABLE_PACKET_HEADER_LENGTH:
+        raise ValueError(
+            f"Received packet header length, {hdr_length}, is unreasonably large."
+        )
+    # Received too little data compared to expected data.
+    # This may require chunking smaller data reads.
+    if len(view) - 4 < hdr_length:
+        raise ValueError(
+            f"Received {len(view)} bytes, but packet header "
+            f"specified {hdr_length + 4} expected bytes. This may be a "
+            "USB compatibility issue between device and program."
+        )
+    # Received too much data compared to expected data.
+    if len(view) - 4 > hdr_length:
+        print(
+            f"Received {len(view) - 4 - hdr_length} extra bytes than the "
+            f"packet header specified ({hdr_length}). This may be a program bug."
+        )
+    return view[4 : 4 + hdr_length]
 
 
 def list_reshape[T](data: list[T], width: int) -> list[list[T]]:
     """Reshape a list into a list of lists, each with a fixed width."""
-    return [data[i : i + width] for i in range(0, len(data), width)]
+    return [list(row) for row in itertools.batched(data, width)]
+
+
+def voltage_lines(volts: Sequence[float] | np.ndarray, width: int) -> list[str]:
+    """Format voltages like " 1.000V", `width` values per line.
+
+    The values are formatted in one vectorized pass instead of one f-string
+    per value.
+    """
+    formatted = np.char.mod("% .3fV", np.asarray(volts, dtype=np.float64))
+    # Join the batched row tuples directly, without copying each into a list.
+    return [" ".join(row) for row in itertools.batched(formatted.tolist(), width)]
+
+
+def hex_dump_lines(data: bytes, width: int, group: int) -> list[str]:
+    """Format bytes as hex, `width` bytes per line, split into `group` byte words.
+
+    Bytes within a word are separated by one space and words by two spaces.
+    """
+    # Hex the whole buffer in one call. With the trailing space, every byte
+    # is exactly 3 characters, so rows and words are plain string slices.
+    text = memoryview(data).hex(" ") + " "
+    row_chars = width * 3
+    word_chars = group * 3
+    return [
+        " ".join(
+            text[j : min(j + word_chars, i + row_chars)]
+            for j in range(i, min(i + row_chars, len(text)), word_chars)
+        ).rstrip()
+        for i in range(0, len(text) - 1, row_chars)
+    ]
 
 
 @overload
@@ -479,7 +745,7 @@ def data_screen_values_to_voltage(
 
 @overload
 def data_screen_values_to_voltage(
-    values: list[int],
+    values: Sequence[int],
     probe_attenuation_factor: int,
     channel_scale: float,
     channel_offset: int,
@@ -487,7 +753,7 @@ def data_screen_values_to_voltage(
 
 
 def data_screen_values_to_voltage(
-    values: int | list[int],
+    values: int | Sequence[int],
     probe_attenuation_factor: int,
     channel_scale: float,
     channel_offset: int,
@@ -500,10 +766,52 @@ def data_screen_values_to_voltage(
         channel_scale: The channel scale in volts (units already applied).
         channel_offset: The channel offset.
     """
-    real_scale = probe_attenuation_factor * channel_scale
-    convert: Callable[[int], float] = (
-        lambda value: (value - channel_offset) * real_scale * 4 / 100
-    )
+    real_scale = probe_attenuation_factor * channel_scale * 4 / 100
     if isinstance(values, int):
-        return convert(values)
-    return [convert(value) for value in values]
+        return (values - channel_offset) * real_scale
+    volts = np.subtract(values, channel_offset, dtype=np.float64)
+    volts *= real_scale
+    return volts.tolist()
+
+
+def data_screen_bytes_to_voltage(
+    data: bytes | memoryview,
+    probe_attenuation_factor: float,
+    channel_scale: float,
+    channel_offset: int,
+) -> np.ndarray:
+    """Convert raw screen data bytes directly to voltages.
+
+    This decodes the signed 8-bit samples and scales them in one vectorized
+    pass, without materializing an intermediate list of ints.
+
+    Args:
+        data: The screen data packet payload, one signed byte per sample.
+        probe_attenuation_factor: The probe attenuation factor.
+        channel_scale: The channel scale in volts (units already applied).
+        channel_offset: The channel offset.
+
+    Returns:
+        A `np.float32` array of voltages.
+    """
+    lut = voltage_lut(probe_attenuation_factor, channel_scale, channel_offset)
+    return lut[np.frombuffer(data, dtype=np.uint8)]
+
+
+@functools.lru_cache(maxsize=16)
+def voltage_lut(
+    probe_attenuation_factor: float, channel_scale: float, channel_offset: int
+) -> np.ndarray:
+    """Build a lookup table from raw screen data bytes to voltages.
+
+    A sample is a signed byte, so there are only 256 possible voltages for a
+    given channel setup. Indexing the table with the samples viewed as
+    `np.uint8` converts a whole capture with a single gather.
+
+    The table is cached and shared between calls, so it is read-only.
+    """
+    samples = np.arange(256, dtype=np.uint8).view(np.int8)
+    lut = np.subtract(samples, channel_offset, dtype=np.float32)
+    lut *= probe_attenuation_factor * channel_scale * 4 / 100
+    lut.flags.writeable = False
+    return lut
@@ -1,8 +1,51 @@
 #!/usr/bin/env python3
 
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-from owon_scpi_base import parse_and_validate_packet
+import numpy as np
+
+from owon_scpi_base import (
+    OwonSCPIBase,
+    data_screen_bytes_to_voltage,
+    data_screen_values_to_voltage,
+    hex_dump_lines,
+    list_reshape,
+    parse_and_validate_packet,
+    voltage_lines,
+    voltage_lut,
+)
+
+
+class FakeSCPI(OwonSCPIBase):
+    """In-memory transport that records writes and replays canned responses."""
+
+    def __init__(self, responses: list[bytes]) -> None:
+        super().__init__()
+        self.written: list[bytes] = []
+        self.responses = responses
+
+    def _write_bytes(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def _read_bytes(self, size: int, timeout_ms: int) -> bytes:
+        if not self.responses:
+            return b""
+        return self.responses.pop(0)[:size]
+
+    def close(self) -> bool:
+        return True
+
+    @classmethod
+    def from_cli_args(cls, args: argparse.Namespace) -> "FakeSCPI":
+        return cls([])
 
 
 class TestParseAndValidatePacket(unittest.TestCase):
@@ -32,6 +75,18 @@ class TestParseAndValidatePacket(unittest.TestCase):
                 length_header=True,
             )
 
+    def test_packet_payload_view(self):
+        """Test that the returned payload is a view with framing stripped."""
+        payload = parse_and_validate_packet(b"\x02\x00\x00\x00ab", length_header=True)
+        self.assertIsInstance(payload, memoryview)
+        self.assertEqual(payload, b"ab")
+        self.assertEqual(parse_and_validate_packet(b"OWON\n"), b"OWON")
+
+    def test_packet_extra_data(self):
+        """Test that data past the specified packet length is stripped."""
+        payload = parse_and_validate_packet(b"\x02\x00\x00\x00abc", length_header=True)
+        self.assertEqual(payload, b"ab")
+
     def test_packet_header_length_too_large(self):
         """Test that a packet header length that is too large is handled correctly."""
         with self.assertRaises(ValueError):
@@ -41,5 +96,296 @@ class TestParseAndValidatePacket(unittest.TestCase):
             )
 
 
+class TestQueryBatch(unittest.TestCase):
+    def test_query_batch_single_write(self):
+        """Test that batched commands are sent as one compound SCPI line."""
+        scpi = FakeSCPI([b"10X\n"])
+        resp = scpi.query_batch([":CH1:PROBe 10X", ":CH1:PROB?"])
+        self.assertEqual(resp, "10X")
+        self.assertEqual(scpi.written, [b":CH1:PROBe 10X;:CH1:PROB?\n"])
+
+    def test_query_batch_empty(self):
+        """Test that an empty batch is rejected."""
+        with self.assertRaises(ValueError):
+            FakeSCPI([]).query_batch([])
+
+
+class TestQueryBinaryBatch(unittest.TestCase):
+    CH1 = b"\x02\x00\x00\x00\x01\x02"
+    CH2 = b"\x03\x00\x00\x00\xfd\xfe\xff"
+
+    def test_packets_in_one_read(self):
+        """Test splitting several packets received in one transfer."""
+        scpi = FakeSCPI([self.CH1 + self.CH2])
+        resp = scpi.query_binary_batch(
+            [":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]
+        )
+        self.assertEqual(resp, [b"\x01\x02", b"\xfd\xfe\xff"])
+        self.assertEqual(
+            scpi.written, [b":DATa:WAVe:SCReen:CH1?;:DATa:WAVe:SCReen:CH2?\n"]
+        )
+
+    def test_packets_across_reads(self):
+        """Test reassembling packets split across transfers."""
+        data = self.CH1 + self.CH2
+        scpi = FakeSCPI([data[:3], data[3:8], data[8:]])
+        resp = scpi.query_binary_batch(
+            [":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]
+        )
+        self.assertEqual(resp, [b"\x01\x02", b"\xfd\xfe\xff"])
+
+    def test_missing_packet(self):
+        """Test that a missing response packet is reported as a failure."""
+        scpi = FakeSCPI([self.CH1])
+        resp = scpi.query_binary_batch(
+            [":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]
+        )
+        self.assertIsNone(resp)
+
+    def test_missing_packet_discards_late_packets(self):
+        """Test that packets arriving after a timeout are not left unread."""
+        scpi = FakeSCPI([self.CH1, b"", self.CH2, b"", b"OWON\n"])
+        resp = scpi.query_binary_batch(
+            [":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]
+        )
+        self.assertIsNone(resp)
+        self.assertEqual(scpi.query("*IDN?"), "OWON")
+
+    def test_bad_header_length(self):
+        """Test that bad header lengths raise without waiting for a payload."""
+        for header in [(5000).to_bytes(4, "little"), bytes(4)]:
+            with self.subTest(header=header):
+                scpi = FakeSCPI([self.CH1 + header, self.CH2, b"", b"OWON\n"])
+                with self.assertRaises(ValueError):
+                    scpi.query_binary_batch(
+                        [":DATa:WAVe:SCReen:CH1?", ":DATa:WAVe:SCReen:CH2?"]
+                    )
+                self.assertEqual(scpi.query("*IDN?"), "OWON")
+
+
+class TestCLIValues(unittest.TestCase):
+    HEAD = json.dumps(
+        {
+            "CHANNEL": [
+                {
+                    "NAME": "CH1",
+                    "PROBE": "10X",
+                    "SCALE": "100mV",
+                    "OFFSET": 2,
+                    "DISPLAY": "ON",
+                },
+                {
+                    "NAME": "CH2",
+                    "PROBE": "1X",
+                    "SCALE": "1V",
+                    "OFFSET": 0,
+                    "DISPLAY": "OFF",
+                },
+            ]
+        }
+    ).encode()
+
+    @staticmethod
+    def packet(payload: bytes) -> bytes:
+        return len(payload).to_bytes(4, "little") + payload
+
+    def run_values(self, scpi: FakeSCPI) -> str:
+        """Run the CLI `values` command once and return its output."""
+        out = io.StringIO()
+        with (
+            mock.patch("builtins.input", side_effect=["values", KeyboardInterrupt]),
+            contextlib.redirect_stdout(out),
+        ):
+            scpi.run_cli_loop()
+        return out.getvalue()
+
+    def test_values_compound_query(self):
+        """Test that values fetches the header and channels in one write."""
+        scpi = FakeSCPI(
+            [
+                b"OWON\n",
+                self.packet(self.HEAD)
+                + self.packet(bytes([2, 27, 0xE9]))
+                + self.packet(bytes(3)),
+            ]
+        )
+        out = self.run_values(scpi)
+        self.assertIn(" 0.000V  1.000V -1.000V", out)
+        self.assertEqual(len(scpi.written), 2)
+
+    def test_values_falls_back_to_single_queries(self):
+        """Test that values retries per command if the compound query fails."""
+        scpi = FakeSCPI(
+            [
+                b"OWON\n",
+                # Only the first compound response packet arrives.
+                self.packet(self.HEAD),
+                b"",
+                # Nothing further arrives while the input is discarded.
+                b"",
+                self.packet(self.HEAD),
+                self.packet(bytes([2, 27, 0xE9])),
+                self.packet(bytes(3)),
+            ]
+        )
+        out = self.run_values(scpi)
+        self.assertIn(" 0.000V  1.000V -1.000V", out)
+        self.assertEqual(
+            scpi.written[2:],
+            [
+                b":DATa:WAVe:SCReen:HEAD?\n",
+                b":DATa:WAVe:SCReen:CH1?\n",
+                b":DATa:WAVe:SCReen:CH2?\n",
+            ],
+        )
+
+    def test_values_fallback_skips_stale_packets(self):
+        """Test that late compound response packets are not read by the fallback."""
+        scpi = FakeSCPI(
+            [
+                b"OWON\n",
+                self.packet(self.HEAD),
+                b"",
+                # The rest of the compound response arrives after the timeout.
+                self.packet(bytes([0xE9, 0xE9, 0xE9])),
+                self.packet(bytes([5])),
+                b"",
+                self.packet(self.HEAD),
+                self.packet(bytes([2, 27, 0xE9])),
+                self.packet(bytes(3)),
+            ]
+        )
+        answers = []
+        query = scpi.query
+
+        def recording_query(command, *args, **kwargs):
+            answers.append((command, query(command, *args, **kwargs)))
+            return answers[-1][1]
+
+        with mock.patch.object(scpi, "query", side_effect=recording_query):
+            out = self.run_values(scpi)
+        self.assertEqual(
+            answers[1:],
+            [
+                (":DATa:WAVe:SCReen:HEAD?", self.HEAD),
+                (":DATa:WAVe:SCReen:CH1?", bytes([2, 27, 0xE9])),
+                (":DATa:WAVe:SCReen:CH2?", bytes(3)),
+            ],
+        )
+        self.assertIn("Received 3 values for ch1.", out)
+        self.assertIn("Received 3 values for ch2.", out)
+        self.assertIn(" 0.000V  1.000V -1.000V", out)
+
+
+class TestSubmitQuery(unittest.TestCase):
+    def test_submit_query_in_order(self):
+        """Test that queued queries complete in submission order."""
+        scpi = FakeSCPI([b"A\n", b"B\n"])
+        first = scpi.submit_query("*IDN?")
+        second = scpi.submit_query(":HORIzontal:SCALe?")
+        self.assertEqual(first.result(timeout=1), "A")
+        self.assertEqual(second.result(timeout=1), "B")
+        self.assertEqual(scpi.written, [b"*IDN?\n", b":HORIzontal:SCALe?\n"])
+        scpi._shutdown_executor()
+
+    def test_submit_concurrently_uses_one_worker(self):
+        """Test that concurrent submissions all run on the same IO thread."""
+        scpi = FakeSCPI([])
+        with ThreadPoolExecutor(max_workers=8) as callers:
+            futures = list(
+                callers.map(
+                    lambda _: scpi.submit(threading.get_ident).result(timeout=1),
+                    range(32),
+                )
+            )
+        self.assertEqual(len(set(futures)), 1)
+        scpi._shutdown_executor()
+
+
+class TestAQuery(unittest.TestCase):
+    def test_aquery(self):
+        """Test that a query can be awaited from an event loop."""
+        scpi = FakeSCPI([b"OWON\n"])
+        resp = asyncio.run(scpi.aquery("*IDN?"))
+        self.assertEqual(resp, "OWON")
+        scpi._shutdown_executor()
+
+
+class TestQueryJSON(unittest.TestCase):
+    def test_query_json(self):
+        """Test that a length prefixed JSON response is parsed."""
+        body = b'{"CHANNEL": [{"NAME": "CH1"}]}'
+        scpi = FakeSCPI([len(body).to_bytes(4, "little") + body])
+        resp = scpi.query(
+            ":DATa:WAVe:SCReen:HEAD?", data_type="json", length_header=True
+        )
+        self.assertEqual(resp, {"CHANNEL": [{"NAME": "CH1"}]})
+
+
+class TestQueryInt8(unittest.TestCase):
+    def test_query_int8(self):
+        """Test that int8 responses are decoded as signed values."""
+        scpi = FakeSCPI([b"\x04\x00\x00\x00\x00\x01\x7f\x80"])
+        resp = scpi.query(
+            ":DATa:WAVe:SCReen:CH1?", data_type="int8", length_header=True
+        )
+        self.assertIsInstance(resp, np.ndarray)
+        self.assertEqual(resp.dtype, np.int8)
+        self.assertEqual(resp.tolist(), [0, 1, 127, -128])
+
+
+class TestDataScreenValuesToVoltage(unittest.TestCase):
+    def test_values_to_voltage(self):
+        """Test screen value conversion for scalars and lists."""
+        # 10X probe at 100mV/div, so 25 counts per 1V division.
+        self.assertAlmostEqual(data_screen_values_to_voltage(27, 10, 0.1, 2), 1.0)
+        volts = data_screen_values_to_voltage([2, 27, -23], 10, 0.1, 2)
+        self.assertIsInstance(volts, list)
+        for got, expected in zip(volts, [0.0, 1.0, -1.0]):
+            self.assertAlmostEqual(got, expected)
+
+
+class TestDataScreenBytesToVoltage(unittest.TestCase):
+    def test_bytes_to_voltage(self):
+        """Test raw signed byte samples are converted to voltages."""
+        volts = data_screen_bytes_to_voltage(bytes([2, 27, 0xE9]), 10, 0.1, 2)
+        self.assertIsInstance(volts, np.ndarray)
+        self.assertEqual(volts.dtype, np.float32)
+        np.testing.assert_allclose(volts, [0.0, 1.0, -1.0], atol=1e-6)
+
+    def test_voltage_lut(self):
+        """Test the lookup table is indexed by the unsigned view of a sample."""
+        lut = voltage_lut(10, 0.1, 2)
+        self.assertEqual(lut.shape, (256,))
+        self.assertFalse(lut.flags.writeable)
+        self.assertAlmostEqual(float(lut[27]), 1.0, places=6)
+        self.assertAlmostEqual(float(lut[0xE9]), -1.0, places=6)
+
+
+class TestHexDumpLines(unittest.TestCase):
+    def test_hex_dump_lines(self):
+        """Test hex dump line wrapping and word grouping."""
+        lines = hex_dump_lines(bytes(range(10)), 8, 4)
+        self.assertEqual(lines, ["00 01 02 03  04 05 06 07", "08 09"])
+        self.assertEqual(hex_dump_lines(b"", 8, 4), [])
+
+
+class TestListReshape(unittest.TestCase):
+    def test_list_reshape(self):
+        """Test reshaping with a partial final row."""
+        self.assertEqual(list_reshape([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(list_reshape([], 2), [])
+
+
+class TestVoltageLines(unittest.TestCase):
+    def test_voltage_lines(self):
+        """Test voltage formatting matches the per-value f-string format."""
+        volts = [1.0, -0.1234, 12.5]
+        self.assertEqual(
+            voltage_lines(volts, 2),
+            [f"{volts[0] : .3f}V {volts[1] : .3f}V", f"{volts[2] : .3f}V"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
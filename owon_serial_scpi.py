@@ -12,10 +12,13 @@ https://github.com/torvalds/linux/commit/4cc01410e1c1dd075df10f750775c81d1cb6672
 """
 
 import argparse
+import os
+import select
+import time
 
 import serial
 
-from owon_scpi_base import OwonSCPIBase
+from owon_scpi_base import LENGTH_HEADER, OwonSCPIBase
 
 
 class OwonSerialSCPI(OwonSCPIBase):
@@ -36,25 +39,102 @@ class OwonSerialSCPI(OwonSCPIBase):
         """
         super().__init__(timeout=timeout, max_response_size=2048)
         self._device = device
+        self._timeout_s = timeout / 1000.0
         # Baud is intentionally left at pyserial defaults. The backing device is
         # USB and does not need meaningful UART timing configuration.
-        self._serial = serial.Serial(device, timeout=timeout / 1000.0)
+        self._serial = serial.Serial(device, timeout=self._timeout_s)
+        # Make room for a whole response in the OS receive buffer, so it is
+        # not split into short reads. Only some platforms (Windows) support
+        # resizing; Linux tty buffers are already large enough.
+        try:
+            self._serial.set_buffer_size(rx_size=65536, tx_size=4096)
+        except (AttributeError, NotImplementedError):
+            pass
+        # On POSIX, reads go straight to the tty file descriptor, bypassing
+        # pyserial's per-call overhead. Other platforms fall back to pyserial.
+        self._fd: int | None = None
+        if os.name == "posix":
+            self._fd = self._serial.fileno()
 
     def _write_bytes(self, data: bytes) -> None:
-        """Write a command payload to the serial device."""
+        """Write a command payload to the serial device.
+
+        There is no `flush()` (tcdrain), since the kernel hands the write
+        straight to the USB stack and the response read waits anyway.
+        """
         self._serial.write(data)
-        self._serial.flush()
+
+    def _seconds(self, timeout_ms: int) -> float:
+        """Convert a timeout to seconds, reusing the precomputed default."""
+        if timeout_ms == self._timeout:
+            return self._timeout_s
+        return timeout_ms / 1000.0
+
+    def _set_timeout(self, timeout_ms: int) -> None:
+        """Apply a read timeout to the serial device."""
+        timeout = self._seconds(timeout_ms)
+        # Setting the timeout reconfigures the tty, so only do it on change.
+        if self._serial.timeout != timeout:
+            self._serial.timeout = timeout
 
     def _read_bytes(self, size: int, timeout_ms: int) -> bytes:
-        """Read up to `size` bytes with timeout behavior matching USB transport."""
-        self._serial.timeout = timeout_ms / 1000.0
-        data = self._serial.read(size)
-        if not data:
-            raise TimeoutError("Timeout")
-        return data
+        """Read `size` bytes, returning fewer (or none) if the timeout expires.
+
+        Unlike a USB bulk read, a serial read does not end at a short packet,
+        so `size` should be the exact number of bytes expected.
+        """
+        if self._fd is not None:
+            return self._read_fd(size, timeout_ms)
+        self._set_timeout(timeout_ms)
+        return self._serial.read(size)
+
+    def _read_fd(
+        self, size: int, timeout_ms: int, terminator: bytes | None = None
+    ) -> bytes:
+        """Read from the tty fd until `size` bytes, `terminator`, or timeout."""
+        assert self._fd is not None
+        deadline = time.monotonic() + self._seconds(timeout_ms)
+        data = bytearray()
+        while len(data) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                break
+            chunk = os.read(self._fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+            if terminator is not None and terminator in chunk:
+                break
+        return bytes(data)
+
+    def _read_packet(self, length_header: bool) -> bytes:
+        """Read exactly one response packet instead of waiting for the timeout.
+
+        Length prefixed packets are read as the header followed by exactly the
+        specified payload size. Text packets are read up to their newline.
+        """
+        if not length_header:
+            if self._fd is not None:
+                return self._read_fd(self.max_response_size, self._timeout, b"\n")
+            self._set_timeout(self._timeout)
+            return self._serial.read_until(b"\n", self.max_response_size)
+
+        header = self._read_bytes(LENGTH_HEADER.size, self._timeout)
+        if len(header) < LENGTH_HEADER.size:
+            return header
+        (length,) = LENGTH_HEADER.unpack(header)
+        # Leave reporting bad lengths to the packet validation.
+        length = min(length, self.max_response_size - LENGTH_HEADER.size)
+        if length == 0:
+            return header
+        return header + self._read_bytes(length, self._timeout)
 
     def close(self) -> bool:
         """Close the serial device if it is open."""
+        self._shutdown_executor()
         if self._serial and self._serial.is_open:
             self._serial.close()
             return True
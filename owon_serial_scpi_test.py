@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import os
+import pty
+import threading
+import time
+import tty
+import unittest
+
+from owon_serial_scpi import OwonSerialSCPI
+
+
+class FakeSerialDevice:
+    """Answers SCPI commands on the master side of a pty.
+
+    Each response is written as a list of chunks with a short pause between
+    them, to reproduce a response split across several transfers.
+    """
+
+    def __init__(self, responses: dict[bytes, list[bytes]]) -> None:
+        self.responses = responses
+        self.master, self.slave = pty.openpty()
+        # Raw mode, so the tty neither echoes nor translates line endings.
+        tty.setraw(self.slave)
+        self.path = os.ttyname(self.slave)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        buffer = b""
+        while True:
+            try:
+                buffer += os.read(self.master, 256)
+            except OSError:
+                return
+            while b"\n" in buffer:
+                command, buffer = buffer.split(b"\n", 1)
+                for i, chunk in enumerate(self.responses.get(command, [])):
+                    if i:
+                        time.sleep(0.02)
+                    os.write(self.master, chunk)
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
+
+
+@unittest.skipUnless(os.name == "posix", "requires a pty")
+class TestOwonSerialSCPI(unittest.TestCase):
+    TIMEOUT_MS = 500
+    PAYLOAD = bytes(i % 256 for i in range(600))
+
+    def setUp(self):
+        self.device = FakeSerialDevice(
+            {
+                b"*IDN?": [b"OWON,HDS2", b"72S,1,V1\n"],
+                b":DATa:WAVe:SCReen:CH1?": [
+                    len(self.PAYLOAD).to_bytes(4, "little") + self.PAYLOAD[:100],
+                    self.PAYLOAD[100:],
+                ],
+            }
+        )
+        self.owon = OwonSerialSCPI(self.device.path, timeout=self.TIMEOUT_MS)
+
+    def tearDown(self):
+        self.owon.close()
+        self.device.close()
+
+    def assertFasterThanTimeout(self, start: float):
+        self.assertLess(time.monotonic() - start, self.TIMEOUT_MS / 1000 / 2)
+
+    def test_text_response(self):
+        """Test that a split text response is read up to its newline."""
+        start = time.monotonic()
+        self.assertEqual(self.owon.query("*IDN?"), "OWON,HDS272S,1,V1")
+        self.assertFasterThanTimeout(start)
+
+    def test_length_prefixed_response(self):
+        """Test that a split length prefixed response is read exactly."""
+        start = time.monotonic()
+        data = self.owon.query(
+            ":DATa:WAVe:SCReen:CH1?", data_type="bin", length_header=True
+        )
+        self.assertEqual(data, self.PAYLOAD)
+        self.assertFasterThanTimeout(start)
+
+    def test_repeated_queries(self):
+        """Test that each query consumes exactly its own response."""
+        for _ in range(3):
+            self.assertEqual(self.owon.query("*IDN?"), "OWON,HDS272S,1,V1")
+            data = self.owon.query(
+                ":DATa:WAVe:SCReen:CH1?", data_type="bin", length_header=True
+            )
+            self.assertEqual(data, self.PAYLOAD)
+
+    def test_pyserial_fallback(self):
+        """Test the pyserial read path used when there is no tty fd."""
+        self.owon._fd = None
+        self.assertEqual(self.owon.query("*IDN?"), "OWON,HDS272S,1,V1")
+        data = self.owon.query(
+            ":DATa:WAVe:SCReen:CH1?", data_type="bin", length_header=True
+        )
+        self.assertEqual(data, self.PAYLOAD)
+
+    def test_timeout(self):
+        """Test that an unanswered query returns None after the timeout."""
+        start = time.monotonic()
+        self.assertIsNone(self.owon.query(":UNKNown?"))
+        self.assertGreaterEqual(time.monotonic() - start, self.TIMEOUT_MS / 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,11 +10,18 @@ https://github.com/pyusb/pyusb/blob/master/docs/tutorial.rst
 """
 
 import argparse
+import array
+import atexit
+import functools
 
 import usb.core
 import usb.util
 
-from owon_scpi_base import OwonSCPIBase
+from owon_scpi_base import (
+    LENGTH_HEADER,
+    UNREASONABLE_PACKET_HEADER_LENGTH,
+    OwonSCPIBase,
+)
 
 
 class OwonUSBSCPI(OwonSCPIBase):
@@ -27,6 +34,10 @@ class OwonUSBSCPI(OwonSCPIBase):
     HDS272S_USB_VENDOR_ID = 0x5345
     HDS272S_USB_PRODUCT_ID = 0x1234
 
+    # Bulk IN transfer length requested per read. This is a multiple of both
+    # the full-speed (64) and high-speed (512) bulk packet sizes.
+    USB_READ_SIZE = 4096
+
     def __init__(
         self,
         usb_vendor_id: int = HDS272S_USB_VENDOR_ID,
@@ -34,6 +45,7 @@ class OwonUSBSCPI(OwonSCPIBase):
         usb_ep_out: int = 0x01,
         usb_ep_in: int = 0x81,
         timeout: int = 1000,
+        reset: bool = False,
     ) -> None:
         """Initialize USB transport and claim the configured interface/endpoints.
 
@@ -43,15 +55,19 @@ class OwonUSBSCPI(OwonSCPIBase):
             usb_ep_out: Bulk OUT endpoint address used for SCPI commands.
             usb_ep_in: Bulk IN endpoint address used for responses.
             timeout: IO timeout in milliseconds.
+            reset: Always reset (re-enumerate) the device before claiming it.
+                Otherwise, it is only reset if it has no active configuration.
 
         Notes:
             max_response_size:
                 The device will claim that the maximum USB packet size is 64
                 bytes, but it will happily transfer 600+ bytes in one IN
                 transaction. Considering this, we use one large size to reduce
-                transaction overhead.
+                transaction overhead. The size is rounded up to a multiple of
+                the endpoint's max packet size, so a transfer always ends on a
+                packet boundary and never overflows.
         """
-        super().__init__(timeout=timeout, max_response_size=2048)
+        super().__init__(timeout=timeout, max_response_size=self.USB_READ_SIZE)
 
         # Find the first device with the correct vendor/product ID.
         self._device = usb.core.find(idVendor=usb_vendor_id, idProduct=usb_product_id)
@@ -62,7 +78,15 @@ class OwonUSBSCPI(OwonSCPIBase):
                 f"product ID {usb_product_id:04x} found."
             )
 
-        self._device.reset()
+        # A reset re-enumerates the device, which is slow, so only do it when
+        # asked or when the device does not look configured.
+        if reset:
+            self._device.reset()
+        else:
+            try:
+                self._device.get_active_configuration()
+            except usb.core.USBError:
+                self._device.reset()
 
         # Detach kernel driver if active.
         if self._device.is_kernel_driver_active(0):
@@ -78,19 +102,56 @@ class OwonUSBSCPI(OwonSCPIBase):
         if self._usb_in is None or self._usb_out is None:
             raise ValueError("Failed to find expected USB IN/OUT endpoints.")
 
+        packet_size = self._usb_in.wMaxPacketSize
+        self.max_response_size = -(-self.USB_READ_SIZE // packet_size) * packet_size
+        # Reused for every full size read, instead of pyusb allocating a new
+        # transfer buffer per read.
+        self._read_buffer = array.array("B", bytes(self.max_response_size))
+        # Bind the endpoint IO methods once for the per-query hot path.
+        self._usb_write = self._usb_out.write
+        self._usb_read = self._usb_in.read
+
     def _write_bytes(self, data: bytes) -> None:
         """Write bytes to the USB OUT endpoint."""
-        self._usb_out.write(data)
+        self._usb_write(data)
 
     def _read_bytes(self, size: int, timeout_ms: int) -> bytes:
-        """Read bytes from the USB IN endpoint."""
+        """Read bytes from the USB IN endpoint, or no bytes on timeout."""
         try:
-            return bytes(self._usb_in.read(size, timeout_ms))
-        except usb.core.USBTimeoutError as e:
-            raise TimeoutError("Timeout") from e
+            if size == len(self._read_buffer):
+                length = self._usb_read(self._read_buffer, timeout_ms)
+                # Copy out only the received bytes, since the buffer is reused.
+                return bytes(memoryview(self._read_buffer)[:length])
+            return bytes(self._usb_read(size, timeout_ms))
+        except usb.core.USBTimeoutError:
+            return b""
+
+    def _read_packet(self, length_header: bool) -> bytes:
+        """Read one response packet, continuing past a single transfer.
+
+        Most responses fit in one transfer, but a length prefixed packet may
+        carry up to `UNREASONABLE_PACKET_HEADER_LENGTH` payload bytes, which
+        together with its header can exceed `max_response_size`.
+        """
+        raw = self._read_bytes(self.max_response_size, self._timeout)
+        if not length_header or len(raw) < LENGTH_HEADER.size:
+            return raw
+        (length,) = LENGTH_HEADER.unpack_from(raw)
+        # Leave reporting bad lengths to the packet validation.
+        end = LENGTH_HEADER.size + min(length, UNREASONABLE_PACKET_HEADER_LENGTH)
+        if len(raw) >= end:
+            return raw
+        data = bytearray(raw)
+        while len(data) < end:
+            chunk = self._read_bytes(self.max_response_size, self._timeout)
+            if not chunk:
+                break
+            data += chunk
+        return bytes(data)
 
     def close(self) -> bool:
         """Close the connection to the device."""
+        self._shutdown_executor()
         if self._device:
             usb.util.dispose_resources(self._device)
             self._device = None
@@ -108,6 +169,7 @@ class OwonUSBSCPI(OwonSCPIBase):
         )
         parser.add_argument("--ep-out", type=lambda v: int(v, 0), default=0x01)
         parser.add_argument("--ep-in", type=lambda v: int(v, 0), default=0x81)
+        parser.add_argument("--reset", action="store_true")
 
     @classmethod
     def from_cli_args(cls, args: argparse.Namespace) -> "OwonUSBSCPI":
@@ -117,9 +179,23 @@ class OwonUSBSCPI(OwonSCPIBase):
             usb_product_id=args.product_id,
             usb_ep_out=args.ep_out,
             usb_ep_in=args.ep_in,
+            reset=args.reset,
         )
 
 
+@functools.cache
+def get_default() -> OwonUSBSCPI:
+    """Open the default USB device once per process and reuse the connection.
+
+    Finding and claiming the device is the slowest part of connecting, so
+    code that connects repeatedly should share this instance. It is closed at
+    interpreter exit, so do not close it directly.
+    """
+    owon = OwonUSBSCPI()
+    atexit.register(owon.close)
+    return owon
+
+
 def main() -> None:
     """Run the shared interactive SCPI CLI over USB transport."""
     OwonUSBSCPI.main()
@@ -3,21 +3,20 @@
 import json
 import unittest
 
+import numpy as np
+
 import owon_usb_scpi
+from owon_scpi_base import OwonSCPIBase
 
 
 class TestOwonUSBSCPI(unittest.TestCase):
-    def setUp(self):
-        """Set up test fixtures before each test method."""
+    @classmethod
+    def setUpClass(cls):
+        """Share the process wide default connection across all test methods."""
         try:
-            self.owon = owon_usb_scpi.OwonUSBSCPI()
+            cls.owon = owon_usb_scpi.get_default()
         except ValueError as e:
-            self.skipTest(f"Device not connected: {e}")
-
-    def tearDown(self):
-        """Clean up after each test method."""
-        if hasattr(self, "owon"):
-            self.owon.close()
+            raise unittest.SkipTest(f"Device not connected: {e}")
 
     def test_device_connection(self):
         """Test basic device connection and identification."""
@@ -65,9 +64,9 @@ class TestOwonUSBSCPI(unittest.TestCase):
         )
         self.assertIsNotNone(ch1_int_data)
         self.assertEqual(len(ch1_int_data), 600)
-        self.assertIsInstance(ch1_int_data, list)
-        for value in ch1_int_data:
-            self.assertIsInstance(value, int)
+        self.assertIsInstance(ch1_int_data, np.ndarray)
+        self.assertEqual(ch1_int_data.dtype, np.int8)
+        for value in ch1_int_data.tolist():
             self.assertTrue(-128 <= value <= 127)  # 8-bit signed integers range
 
     def test_json_data(self):
@@ -81,5 +80,43 @@ class TestOwonUSBSCPI(unittest.TestCase):
         self.assertIn("CHANNEL", head_data)
 
 
+class FakeUSBSCPI(owon_usb_scpi.OwonUSBSCPI):
+    """USB transport without a device, replaying canned IN transfers."""
+
+    def __init__(self, transfers: list[bytes]) -> None:
+        OwonSCPIBase.__init__(self, max_response_size=self.USB_READ_SIZE)
+        self.transfers = transfers
+
+    def _write_bytes(self, data: bytes) -> None:
+        pass
+
+    def _read_bytes(self, size: int, timeout_ms: int) -> bytes:
+        if not self.transfers:
+            return b""
+        return self.transfers.pop(0)[:size]
+
+    def close(self) -> bool:
+        return True
+
+
+class TestOwonUSBSCPIOffline(unittest.TestCase):
+    def test_packet_larger_than_one_transfer(self):
+        """Test that a largest plausible packet is read across two transfers."""
+        payload = bytes(i % 256 for i in range(4096))
+        packet = len(payload).to_bytes(4, "little") + payload
+        size = owon_usb_scpi.OwonUSBSCPI.USB_READ_SIZE
+        owon = FakeUSBSCPI([packet[:size], packet[size:]])
+        data = owon.query(":DATa:WAVe:SCReen:CH1?", data_type="bin", length_header=True)
+        self.assertEqual(data, payload)
+        self.assertEqual(owon.transfers, [])
+
+    def test_packet_in_one_transfer(self):
+        """Test that a packet in one transfer does not wait for another read."""
+        owon = FakeUSBSCPI([b"\x02\x00\x00\x00ab", b"OWON\n"])
+        data = owon.query(":DATa:WAVe:SCReen:CH1?", data_type="bin", length_header=True)
+        self.assertEqual(data, b"ab")
+        self.assertEqual(owon.transfers, [b"OWON\n"])
+
+
 if __name__ == "__main__":
     unittest.main()
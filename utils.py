@@ -1,17 +1,25 @@
+import functools
+import re
 
+# Leading number and trailing units, like "100mV" or "2.5us". The number group
+# mirrors the characters accepted by float()/int(), so bad input still raises.
+_INT_UNITS_RE = re.compile(r"(\d*)(.*)", re.DOTALL)
+_FLOAT_UNITS_RE = re.compile(r"([\d.]*)(.*)", re.DOTALL)
+
+
+# The device reports values from a small vocabulary ("10X", "100mV", ...), so
+# repeated parses are served from a cache.
+@functools.lru_cache(maxsize=128)
 def split_int_units(value: str) -> tuple[int, str]:
     """Parse a number with units from string as an int."""
 
-    for i, c in enumerate(value):
-        if not c.isdigit():
-            return int(value[:i]), value[i:]
-    return int(value), ""
+    number, units = _INT_UNITS_RE.fullmatch(value).groups()
+    return int(number), units
 
 
+@functools.lru_cache(maxsize=128)
 def split_float_units(value: str) -> tuple[float, str]:
     """Parse a number with units from string as a float."""
 
-    for i, c in enumerate(value):
-        if not c.isdigit() and c != ".":
-            return float(value[:i]), value[i:]
-    return float(value), ""
+    number, units = _FLOAT_UNITS_RE.fullmatch(value).groups()
+    return float(number), units
@@ -19,6 +19,26 @@ class TestHelperFunctions(unittest.TestCase):
                 result = utils.split_int_units(input_str)
                 self.assertEqual(result, expected)
 
+    def test_split_float_units(self):
+        """Test the split_float_units function."""
+        test_cases = [
+            ("100mV", (100.0, "mV")),
+            ("2.5us", (2.5, "us")),
+            ("1.0", (1.0, "")),
+            ("10X", (10.0, "X")),
+        ]
+        for input_str, expected in test_cases:
+            with self.subTest(input_str=input_str):
+                result = utils.split_float_units(input_str)
+                self.assertEqual(result, expected)
+
+    def test_split_units_without_number(self):
+        """Test that a value without a leading number is rejected."""
+        with self.assertRaises(ValueError):
+            utils.split_int_units("mV")
+        with self.assertRaises(ValueError):
+            utils.split_float_units("mV")
+
 
 if __name__ == "__main__":
     unittest.main()